@@ -4,11 +4,18 @@ Exemplo avançado com análise de retry e otimização
 
 import os
 import logging
-from vizeval import OpenAI, VizevalConfig, Evaluator
+from vizeval import OpenAI, VizevalClient, VizevalConfig, Evaluator
 from vizeval.exceptions import VizevalThresholdError, VizevalOpenAIError
 
-# Configurar logging detalhado
-logging.basicConfig(level=logging.DEBUG)
+try:
+    from skopt import Optimizer
+    from skopt.space import Real
+except ImportError:  # scikit-optimize é opcional (pip install "scikit-optimize>=0.10")
+    Optimizer = None
+
+# Configurar logging: detalhado apenas para a SDK, sem o ruído do httpx/httpcore
+logging.basicConfig(level=logging.INFO)
+logging.getLogger("vizeval").setLevel(logging.DEBUG)
 
 def main():
     # Configurações para diferentes cenários
@@ -55,6 +62,9 @@ def main():
         }
     ]
     
+    # Um único cliente Vizeval (e uma única conexão HTTP) para todas as estratégias
+    vizeval_client = VizevalClient(api_key=os.getenv("VIZEVAL_API_KEY"))
+    
     print("=== Análise Comparativa de Estratégias ===")
     
     for strategy_name, config in configs.items():
@@ -63,7 +73,8 @@ def main():
         
         client = OpenAI(
             api_key=os.getenv("OPENAI_API_KEY"),
-            vizeval_config=config
+            vizeval_config=config,
+            vizeval_client=vizeval_client
         )
         
         strategy_results = []
@@ -113,7 +124,8 @@ def main():
     
     client_adaptive = OpenAI(
         api_key=os.getenv("OPENAI_API_KEY"),
-        vizeval_config=adaptive_config
+        vizeval_config=adaptive_config,
+        vizeval_client=vizeval_client
     )
     
     # Pergunta complexa que pode precisar de ajustes
@@ -150,6 +162,8 @@ def main():
     print("Resultados da otimização:")
     for params, score in optimization_results.items():
         print(f"  {params}: {score:.3f}")
+    
+    vizeval_client.close()
 
 
 def analyze_retry_result(result):
@@ -180,10 +194,21 @@ def print_strategy_report(strategy_name, results):
     if not results:
         return
     
-    total_attempts = sum(r["attempts"] for r in results)
-    avg_score = sum(r["final_score"] for r in results) / len(results)
-    success_rate = sum(1 for r in results if r["passed"]) / len(results)
-    avg_efficiency = sum(r["efficiency"] for r in results) / len(results)
+    # Acumular todas as métricas em uma única passada
+    total_attempts = 0
+    total_score = 0.0
+    pass_count = 0
+    total_efficiency = 0.0
+    for r in results:
+        total_attempts += r["attempts"]
+        total_score += r["final_score"]
+        pass_count += r["passed"]
+        total_efficiency += r["efficiency"]
+    
+    n = len(results)
+    avg_score = total_score / n
+    success_rate = pass_count / n
+    avg_efficiency = total_efficiency / n
     
     print(f"\n📊 Relatório da Estratégia {strategy_name.upper()}:")
     print(f"  Total de tentativas: {total_attempts}")
@@ -192,8 +217,64 @@ def print_strategy_report(strategy_name, results):
     print(f"  Eficiência média: {avg_efficiency:.1f}%")
 
 
-def optimize_parameters(client, question, target_score):
-    """Otimiza parâmetros para atingir um score alvo"""
+def run_with_params(client, question, params):
+    """Executa a pergunta com um conjunto de parâmetros de geração"""
+    return client.chat.completions.create(
+        model="gpt-4",
+        messages=[
+            {"role": "system", "content": question["system"]},
+            {"role": "user", "content": question["user"]}
+        ],
+        **params
+    )
+
+
+def optimize_parameters(client, question, target_score, n_trials=6):
+    """
+    Otimiza parâmetros para atingir um score alvo
+    
+    Usa otimização bayesiana (processo gaussiano + expected improvement) para
+    escolher cada novo ponto a partir dos scores já observados, parando assim
+    que o score alvo é atingido. Sem o scikit-optimize instalado, recorre à
+    busca em grade.
+    """
+    if Optimizer is None:
+        return grid_search_parameters(client, question, target_score)
+    
+    optimizer = Optimizer(
+        dimensions=[Real(0.0, 1.0, name="temperature"), Real(0.5, 1.0, name="top_p")],
+        base_estimator="GP",
+        acq_func="EI",
+        n_initial_points=3
+    )
+    
+    results = {}
+    
+    for _ in range(n_trials):
+        temperature, top_p = optimizer.ask()
+        params = {"temperature": round(temperature, 2), "top_p": round(top_p, 2)}
+        
+        try:
+            result = run_with_params(client, question, params)
+            score = result.final_evaluation.score or 0
+        except Exception as e:
+            print(f"Erro com parâmetros {params}: {e}")
+            score = 0
+        
+        # O scikit-optimize minimiza, então informamos o score negativo
+        optimizer.tell([temperature, top_p], -score)
+        
+        params_str = f"temp={params['temperature']}, top_p={params['top_p']}"
+        results[params_str] = score
+        
+        if score >= target_score:
+            break
+    
+    return results
+
+
+def grid_search_parameters(client, question, target_score):
+    """Avalia uma grade fixa de parâmetros, parando no primeiro score alvo"""
     parameter_combinations = [
         {"temperature": 0.3, "top_p": 0.9},
         {"temperature": 0.5, "top_p": 0.95},
@@ -201,25 +282,26 @@ def optimize_parameters(client, question, target_score):
         {"temperature": 0.9, "top_p": 0.8},
     ]
     
+    # Temperaturas intermediárias costumam ser as melhores: testá-las primeiro
+    temperatures = sorted(p["temperature"] for p in parameter_combinations)
+    median_temperature = temperatures[len(temperatures) // 2]
+    parameter_combinations.sort(key=lambda p: abs(p["temperature"] - median_temperature))
+    
     results = {}
     
     for params in parameter_combinations:
         try:
-            result = client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": question["system"]},
-                    {"role": "user", "content": question["user"]}
-                ],
-                **params
-            )
-            
-            score = result.final_evaluation.score or 0
-            params_str = f"temp={params['temperature']}, top_p={params['top_p']}"
-            results[params_str] = score
-            
+            result = run_with_params(client, question, params)
         except Exception as e:
             print(f"Erro com parâmetros {params}: {e}")
+            continue
+            
+        score = result.final_evaluation.score or 0
+        params_str = f"temp={params['temperature']}, top_p={params['top_p']}"
+        results[params_str] = score
+    
+        if score >= target_score:
+            break
     
     return results
 
@@ -43,14 +43,18 @@ def main():
     
     evaluators = [Evaluator.MEDICAL, Evaluator.DUMMY]
     
-    for evaluator in evaluators:
-        evaluation = client.evaluate(
-            system_prompt=system_prompt,
-            user_prompt=user_prompt,
-            response=response,
-            evaluator=evaluator
-        )
+    # Todas as avaliações vão em uma única requisição
+    evaluations = client.evaluate_batch([
+        {
+            "system_prompt": system_prompt,
+            "user_prompt": user_prompt,
+            "response": response,
+            "evaluator": evaluator
+        }
+        for evaluator in evaluators
+    ])
         
+    for evaluator, evaluation in zip(evaluators, evaluations):
         print(f"\n{evaluator.value}:")
         print(f"  Score: {evaluation.score}")
         print(f"  Passou threshold: {evaluation.passed_threshold}")
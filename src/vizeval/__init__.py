@@ -5,21 +5,37 @@ Esta SDK permite integração transparente com a API Vizeval para avaliar
 respostas de LLMs com foco em conteúdo médico e de saúde.
 """
 
+from typing import TYPE_CHECKING, Any
+
 from .client import VizevalClient
-from .openai_wrapper import OpenAI
-from .models import EvaluationRequest, EvaluationResponse, VizevalConfig
+from .models import BatchEvaluationRequest, EvaluationRequest, EvaluationResponse, VizevalConfig
 from .evaluators import Evaluator
+from .retry import AdaptiveRetryPolicy
 from .exceptions import VizevalError, VizevalAPIError, VizevalConfigError
 
+if TYPE_CHECKING:
+    from .openai_wrapper import OpenAI
+
 __version__ = "0.1.1"
 __all__ = [
     "VizevalClient",
     "OpenAI",
     "EvaluationRequest",
+    "BatchEvaluationRequest",
     "EvaluationResponse", 
     "VizevalConfig",
     "Evaluator",
+    "AdaptiveRetryPolicy",
     "VizevalError",
     "VizevalAPIError",
     "VizevalConfigError",
-] 
\ No newline at end of file
+]
+
+
+def __getattr__(name: str) -> Any:
+    # O wrapper carrega todo o SDK da OpenAI; importado apenas no primeiro acesso
+    if name == "OpenAI":
+        from .openai_wrapper import OpenAI
+        globals()["OpenAI"] = OpenAI
+        return OpenAI
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}") 
\ No newline at end of file
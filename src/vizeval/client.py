@@ -2,14 +2,49 @@
 Cliente principal para comunicação com a API Vizeval
 """
 
-import requests
-import json
-from typing import Optional, Dict, Any
-from urllib.parse import urljoin
+import asyncio
+import hashlib
+import httpx
+import orjson
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, NoReturn, Tuple, Union
 
-from .models import EvaluationRequest, EvaluationResponse, VizevalConfig
+from .models import (
+    _adapter,
+    BatchEvaluationRequest,
+    EvaluationBodyTemplate,
+    EvaluationRequest,
+    EvaluationResponse,
+    VizevalConfig,
+)
 from .exceptions import VizevalAPIError, VizevalConfigError
-from .evaluators import validate_evaluator
+from .evaluators import Evaluator, validate_evaluator
+
+try:
+    import msgspec
+except ImportError:  # msgspec é opcional (pip install vizeval[msgspec])
+    msgspec = None  # type: ignore[assignment]
+
+# Tempo (em segundos) durante o qual o resultado do health check é reutilizado
+HEALTH_CHECK_TTL = 30.0
+
+# Número máximo de avaliações mantidas no cache de cada cliente
+EVALUATION_CACHE_SIZE = 256
+
+# Tempo (em segundos) que uma conexão ociosa fica no pool. Entre duas avaliações
+# do loop de retry há uma chamada ao LLM, que costuma passar dos 5s default do
+# httpx; sem isso cada retry pagaria um novo handshake TCP+TLS
+KEEPALIVE_EXPIRY = 120.0
+
+# Com o msgspec instalado, o JSON da avaliação é decodificado direto para
+# EvaluationResponse, sem passar por um dict intermediário; strict=False aceita
+# scores em string ("0.9"), como EvaluationResponse.from_api
+_EVALUATION_DECODER = (
+    msgspec.json.Decoder(EvaluationResponse, strict=False) if msgspec is not None else None
+)
 
 
 class VizevalClient:
@@ -28,20 +63,52 @@ class VizevalClient:
         
         self.api_key = api_key
         self.base_url = base_url.rstrip('/')
-        self.session = requests.Session()
-        self.session.headers.update({
+        self._eval_url = f"{self.base_url}/evaluation/"
+        self._batch_eval_url = f"{self.base_url}/evaluation/batch"
+        self._user_eval_url = f"{self.base_url}/user/evaluations"
+        self._health_url = f"{self.base_url}/health"
+        self._headers = {
             'Content-Type': 'application/json',
-            'User-Agent': 'Vizeval-SDK/0.1.0'
-        })
+            'User-Agent': 'Vizeval-SDK/0.1.0',
+            # A chave vai no header para não aparecer em URLs e logs de acesso
+            'X-API-Key': api_key
+        }
+        self._limits = httpx.Limits(
+            max_keepalive_connections=20,
+            max_connections=100,
+            keepalive_expiry=KEEPALIVE_EXPIRY
+        )
+        # Conexão persistente com HTTP/2: avaliações concorrentes compartilham
+        # a mesma conexão TCP+TLS
+        self.session = httpx.Client(
+            http2=True,
+            headers=self._headers,
+            timeout=30.0,
+            limits=self._limits
+        )
+        # Clientes assíncronos criados sob demanda, um por event loop: o pool de
+        # conexões só vale no loop em que foi criado
+        self._async_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+        # (instante da verificação, resultado) do último health check
+        self._health_cache: Optional[Tuple[float, bool]] = None
+        # Cache LRU de avaliações já concluídas
+        self._cache: "OrderedDict[str, EvaluationResponse]" = OrderedDict()
+        # httpx.Client é thread-safe, então o cliente pode ser compartilhado
+        # entre threads; get/move_to_end/popitem precisam ser atômicos
+        self._cache_lock = threading.Lock()
+        self._cache_max = EVALUATION_CACHE_SIZE
     
     def evaluate(
         self, 
         system_prompt: str,
         user_prompt: str,
         response: str,
-        evaluator: str = "medical",
+        evaluator: Union[str, Evaluator] = Evaluator.MEDICAL,
         metadata: Optional[Dict[str, Any]] = None,
-        async_mode: bool = False
+        async_mode: bool = False,
+        cache: bool = True
     ) -> EvaluationResponse:
         """
         Avalia uma resposta usando a API Vizeval
@@ -53,6 +120,7 @@ class VizevalClient:
             evaluator: Tipo de evaluator a ser usado
             metadata: Metadados adicionais
             async_mode: Se deve usar modo assíncrono
+            cache: Se deve reutilizar avaliações idênticas já concluídas
             
         Returns:
             EvaluationResponse com o resultado da avaliação
@@ -61,20 +129,164 @@ class VizevalClient:
             VizevalAPIError: Se ocorrer erro na API
             VizevalConfigError: Se a configuração estiver inválida
         """
-        if not validate_evaluator(evaluator):
-            raise VizevalConfigError(f"Evaluator '{evaluator}' não é válido")
+        request_data = self._build_request(
+            system_prompt, user_prompt, response, evaluator, metadata, async_mode
+        )
+        
+        if not cache:
+            return self._make_evaluation_request(request_data)
+        
+        key = self._cache_key(request_data)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
+        evaluation = self._make_evaluation_request(request_data)
+        self._cache_put(key, evaluation)
+        return evaluation
+    
+    async def aevaluate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        response: str,
+        evaluator: Union[str, Evaluator] = Evaluator.MEDICAL,
+        metadata: Optional[Dict[str, Any]] = None,
+        async_mode: bool = False,
+        cache: bool = True
+    ) -> EvaluationResponse:
+        """
+        Versão assíncrona de `evaluate`
+        
+        Permite sobrepor várias avaliações no mesmo event loop, reutilizando
+        o pool de conexões de um único `httpx.AsyncClient`.
+        
+        Args:
+            system_prompt: Prompt do sistema usado na geração
+            user_prompt: Prompt do usuário
+            response: Resposta do LLM a ser avaliada
+            evaluator: Tipo de evaluator a ser usado
+            metadata: Metadados adicionais
+            async_mode: Se deve usar modo assíncrono
+            cache: Se deve reutilizar avaliações idênticas já concluídas
+        
+        Returns:
+            EvaluationResponse com o resultado da avaliação
+        
+        Raises:
+            VizevalAPIError: Se ocorrer erro na API
+            VizevalConfigError: Se a configuração estiver inválida
+        """
+        request_data = self._build_request(
+            system_prompt, user_prompt, response, evaluator, metadata, async_mode
+        )
+        
+        if not cache:
+            return await self._amake_evaluation_request(request_data)
+        
+        key = self._cache_key(request_data)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
         
-        request_data = EvaluationRequest(
+        evaluation = await self._amake_evaluation_request(request_data)
+        self._cache_put(key, evaluation)
+        return evaluation
+    
+    async def aevaluate_many(self, items: List[Dict[str, Any]]) -> List[EvaluationResponse]:
+        """
+        Executa várias avaliações de forma concorrente
+        
+        Args:
+            items: Lista de dicts com os argumentos de `aevaluate`
+        
+        Returns:
+            Lista de EvaluationResponse na mesma ordem de `items`
+        """
+        return list(await asyncio.gather(*[self.aevaluate(**item) for item in items]))
+    
+    @staticmethod
+    def _cache_key(request_data: EvaluationRequest) -> str:
+        """Gera a chave de cache de uma avaliação (todos os campos da requisição)"""
+        content = "\0".join((
+            request_data.evaluator.value,
+            request_data.system_prompt,
+            request_data.user_prompt,
+            request_data.response,
+            # Metadados diferentes (ex.: outro user_id) geram outro registro na API
+            orjson.dumps(request_data.metadata, option=orjson.OPT_SORT_KEYS).decode(),
+            str(request_data.async_mode)
+        ))
+        # blake2b: mais rápido que sha256 em textos longos; o uso não é criptográfico
+        return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+    
+    def _cache_get(self, key: str) -> Optional[EvaluationResponse]:
+        """Busca uma avaliação no cache, marcando-a como usada recentemente"""
+        with self._cache_lock:
+            evaluation = self._cache.get(key)
+            if evaluation is not None:
+                self._cache.move_to_end(key)
+        return evaluation
+    
+    def _cache_put(self, key: str, evaluation: EvaluationResponse) -> None:
+        """Armazena uma avaliação concluída, descartando a menos usada se necessário"""
+        # Avaliações sem score (ex.: modo assíncrono) não são reutilizáveis
+        if evaluation.score is None:
+            return
+        with self._cache_lock:
+            self._cache[key] = evaluation
+            self._cache.move_to_end(key)
+            if len(self._cache) > self._cache_max:
+                self._cache.popitem(last=False)
+    
+    def _build_request(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        response: str,
+        evaluator: Union[str, Evaluator] = Evaluator.MEDICAL,
+        metadata: Optional[Dict[str, Any]] = None,
+        async_mode: bool = False
+    ) -> EvaluationRequest:
+        """Valida o evaluator e monta a requisição de avaliação"""
+        # Membros do enum são válidos por construção
+        if not isinstance(evaluator, Evaluator):
+            if not validate_evaluator(evaluator):
+                raise VizevalConfigError(f"Evaluator '{evaluator}' não é válido")
+            evaluator = Evaluator(evaluator)
+        
+        return EvaluationRequest(
             system_prompt=system_prompt,
             user_prompt=user_prompt,
             response=response,
             evaluator=evaluator,
-            metadata=metadata or {},
             api_key=self.api_key,
+            metadata=metadata or {},
             async_mode=async_mode
         )
+    
+    def _build_body_template(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        evaluator: Union[str, Evaluator] = Evaluator.MEDICAL,
+        metadata: Optional[Dict[str, Any]] = None,
+        async_mode: bool = False
+    ) -> EvaluationBodyTemplate:
+        """
+        Serializa uma única vez os campos fixos de uma avaliação
         
-        return self._make_evaluation_request(request_data)
+        Usado pelo loop de retry, em que apenas `response` muda entre tentativas.
+        O corpo final é obtido com `template.render(response)` e enviado via
+        `_make_evaluation_request_raw`.
+        """
+        request_data = self._build_request(
+            system_prompt, user_prompt, "", evaluator, metadata, async_mode
+        )
+        data = request_data.to_dict()
+        del data["response"]
+        fields = orjson.dumps(data)
+        return EvaluationBodyTemplate(prefix=fields[:-1] + b',"response":')
     
     def _make_evaluation_request(self, request_data: EvaluationRequest) -> EvaluationResponse:
         """
@@ -89,39 +301,210 @@ class VizevalClient:
         Raises:
             VizevalAPIError: Se ocorrer erro na API
         """
-        url = urljoin(self.base_url, "/evaluation/")
+        return self._make_evaluation_request_raw(orjson.dumps(request_data))
+    
+    def _make_evaluation_request_raw(self, body: bytes) -> EvaluationResponse:
+        """
+        Envia um corpo já serializado para a API de avaliação
+        
+        Args:
+            body: JSON da requisição em bytes
+        
+        Returns:
+            EvaluationResponse com o resultado
         
+        Raises:
+            VizevalAPIError: Se ocorrer erro na API
+        """
         try:
-            response = self.session.post(
-                url,
-                data=request_data.model_dump_json(),
-                timeout=30
-            )
+            response = self.session.post(self._eval_url, content=body)
+            return self._decode_evaluation(response)
             
-            # Trata erros HTTP
-            if response.status_code != 201:
-                error_message = f"Erro na API Vizeval: {response.status_code}"
-                try:
-                    error_data = response.json()
-                    if "detail" in error_data:
-                        error_message = f"{error_message} - {error_data['detail']}"
-                except:
-                    pass
+        except httpx.HTTPError as e:
+            raise VizevalAPIError(f"Erro de conexão com a API Vizeval: {str(e)}")
+    
+    async def _amake_evaluation_request(self, request_data: EvaluationRequest) -> EvaluationResponse:
+        """
+        Faz a requisição assíncrona para a API de avaliação
+        
+        Args:
+            request_data: Dados da requisição
+        
+        Returns:
+            EvaluationResponse com o resultado
+        
+        Raises:
+            VizevalAPIError: Se ocorrer erro na API
+        """
+        return await self._amake_evaluation_request_raw(orjson.dumps(request_data))
+    
+    async def _amake_evaluation_request_raw(self, body: bytes) -> EvaluationResponse:
+        """
+        Envia de forma assíncrona um corpo já serializado para a API de avaliação
+        
+        Args:
+            body: JSON da requisição em bytes
+        
+        Returns:
+            EvaluationResponse com o resultado
+        
+        Raises:
+            VizevalAPIError: Se ocorrer erro na API
+        """
+        try:
+            response = await self._get_async_session().post(self._eval_url, content=body)
+            return self._decode_evaluation(response)
+        
+        except httpx.HTTPError as e:
+            raise VizevalAPIError(f"Erro de conexão com a API Vizeval: {str(e)}")
+    
+    def _decode_evaluation(self, response: httpx.Response) -> EvaluationResponse:
+        """
+        Valida o status e converte uma resposta da API de avaliação em EvaluationResponse
+        
+        Raises:
+            VizevalAPIError: Se a API retornar erro ou um corpo inválido
+        """
+        if _EVALUATION_DECODER is not None and response.status_code == 201:
+            try:
+                evaluation: EvaluationResponse = _EVALUATION_DECODER.decode(response.content)
+                return evaluation
+            except msgspec.ValidationError as e:
+                raise VizevalAPIError(f"Resposta de avaliação inválida: {str(e)}")
+            except msgspec.DecodeError as e:
+                raise VizevalAPIError(f"Erro ao parsear resposta da API: {str(e)}")
+        
+        return EvaluationResponse.from_api(self._parse_response_body(response))
+    
+    def _parse_response_body(self, response: httpx.Response) -> Any:
+        """
+        Valida o status e decodifica o corpo de uma resposta da API de avaliação
+        
+        Args:
+            response: Resposta HTTP
+        
+        Returns:
+            Corpo JSON decodificado
+        
+        Raises:
+            VizevalAPIError: Se a API retornar erro ou um corpo inválido
+        """
+        # Caminho de sucesso primeiro: a API responde 201 Created
+        if response.status_code == 201:
+            try:
+                return orjson.loads(response.content)
+            except orjson.JSONDecodeError as e:
+                raise VizevalAPIError(f"Erro ao parsear resposta da API: {str(e)}")
                 
-                raise VizevalAPIError(
-                    error_message,
-                    status_code=response.status_code,
-                    response_data=response.json() if response.content else {}
-                )
-            
-            # Parse da resposta
-            response_data = response.json()
-            return EvaluationResponse(**response_data)
+        self._raise_api_error(response)
+    
+    def _raise_api_error(self, response: httpx.Response) -> NoReturn:
+        """
+        Levanta VizevalAPIError para uma resposta de erro da API
+        
+        Raises:
+            VizevalAPIError: Sempre, com status e corpo da resposta
+        """
+        error_message = f"Erro na API Vizeval: {response.status_code}"
+        error_data = self._decode_error_body(response)
+        if isinstance(error_data, dict) and "detail" in error_data:
+            error_message = f"{error_message} - {error_data['detail']}"
             
-        except requests.exceptions.RequestException as e:
+        raise VizevalAPIError(
+            error_message,
+            status_code=response.status_code,
+            response_data=error_data
+        )
+    
+    @staticmethod
+    def _decode_error_body(response: httpx.Response) -> Any:
+        """Decodifica o corpo de uma resposta de erro, tolerando corpos que não são JSON"""
+        if not response.content:
+            return {}
+        try:
+            return orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            return {}
+    
+    def _get_async_session(self) -> httpx.AsyncClient:
+        """
+        Retorna o cliente assíncrono do event loop atual, criando-o se necessário
+        
+        Cada loop (ex.: chamadas seguidas a `asyncio.run` ou threads com loops
+        próprios) tem seu cliente; o de um loop que já terminou é liberado junto
+        com ele.
+        """
+        loop = asyncio.get_running_loop()
+        session = self._async_sessions.get(loop)
+        if session is None:
+            session = httpx.AsyncClient(
+                http2=True,
+                headers=self._headers,
+                timeout=30.0,
+                limits=self._limits
+            )
+            self._async_sessions[loop] = session
+        return session
+    
+    def _discard_async_sessions(self) -> None:
+        """Fecha os clientes assíncronos de todos os loops, cada um no seu loop"""
+        while self._async_sessions:
+            loop, session = self._async_sessions.popitem()
+            if loop.is_closed():
+                # Com o loop fechado as conexões já estão mortas; basta soltar a referência
+                continue
+            if loop.is_running():
+                asyncio.run_coroutine_threadsafe(session.aclose(), loop)
+            elif not self._in_running_loop():
+                loop.run_until_complete(session.aclose())
+    
+    @staticmethod
+    def _in_running_loop() -> bool:
+        """Indica se há um event loop rodando na thread atual"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return True
+    
+    def evaluate_batch(self, items: List[Dict[str, Any]]) -> List[EvaluationResponse]:
+        """
+        Avalia várias respostas em uma única requisição à API Vizeval
+        
+        Args:
+            items: Lista de dicts com as chaves `system_prompt`, `user_prompt`,
+                `response` e, opcionalmente, `evaluator`, `metadata` e
+                `async_mode`; o lote não passa pelo cache, então `cache` não é
+                aceito
+        
+        Returns:
+            Lista de EvaluationResponse na mesma ordem de `items`
+        
+        Raises:
+            VizevalAPIError: Se ocorrer erro na API
+            VizevalConfigError: Se algum item tiver configuração inválida
+        """
+        batch = BatchEvaluationRequest(
+            items=[self._build_request(**item) for item in items],
+            api_key=self.api_key
+        )
+        
+        try:
+            response = self.session.post(self._batch_eval_url, content=orjson.dumps(batch))
+        except httpx.HTTPError as e:
             raise VizevalAPIError(f"Erro de conexão com a API Vizeval: {str(e)}")
-        except json.JSONDecodeError as e:
-            raise VizevalAPIError(f"Erro ao parsear resposta da API: {str(e)}")
+        
+        if response.status_code != 201:
+            self._raise_api_error(response)
+        
+        # Validação em lote direto dos bytes, com o TypeAdapter reaproveitado
+        try:
+            evaluations: List[EvaluationResponse] = _adapter(List[EvaluationResponse]).validate_json(
+                response.content
+            )
+            return evaluations
+        except ValueError as e:
+            raise VizevalAPIError(f"Resposta de avaliação inválida: {str(e)}")
     
     def get_user_evaluations(self) -> list:
         """
@@ -133,41 +516,53 @@ class VizevalClient:
         Raises:
             VizevalAPIError: Se ocorrer erro na API
         """
-        url = urljoin(self.base_url, "/user/evaluations")
-        
         try:
-            response = self.session.get(
-                url,
-                params={"api_key": self.api_key},
-                timeout=30
-            )
+            response = self.session.get(self._user_eval_url)
             
             if response.status_code != 200:
                 raise VizevalAPIError(
                     f"Erro ao obter avaliações: {response.status_code}",
                     status_code=response.status_code,
-                    response_data=response.json() if response.content else {}
+                    response_data=self._decode_error_body(response)
                 )
             
-            return response.json()
+            return orjson.loads(response.content)
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             raise VizevalAPIError(f"Erro de conexão com a API Vizeval: {str(e)}")
     
     def health_check(self) -> bool:
         """
         Verifica se a API está funcionando
         
+        O resultado fica em cache por HEALTH_CHECK_TTL segundos.
+        
         Returns:
             True se a API estiver funcionando
         """
+        now = time.monotonic()
+        if self._health_cache is not None and now - self._health_cache[0] < HEALTH_CHECK_TTL:
+            return self._health_cache[1]
+        
         try:
-            url = urljoin(self.base_url, "/health")
-            response = self.session.get(url, timeout=10)
-            return response.status_code == 200
+            response = self.session.head(self._health_url, timeout=2)
+            # Servidores que não aceitam HEAD na rota respondem 405
+            if response.status_code == 405:
+                response = self.session.get(self._health_url, timeout=2)
+            healthy = response.status_code == 200
         except:
-            return False
+            healthy = False
+        
+        self._health_cache = (now, healthy)
+        return healthy
+    
+    def close(self) -> None:
+        """Fecha a sessão HTTP e os clientes assíncronos, se houver"""
+        self.session.close()
+        self._discard_async_sessions()
     
-    def close(self):
-        """Fecha a sessão HTTP"""
-        self.session.close() 
\ No newline at end of file
+    async def aclose(self) -> None:
+        """Fecha o cliente HTTP assíncrono do event loop atual; os de outros loops ficam para `close`"""
+        session = self._async_sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.aclose() 
\ No newline at end of file
@@ -3,7 +3,9 @@ Constantes e enums para evaluators Vizeval
 """
 
 from enum import Enum
-from typing import List
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Final, FrozenSet, List, Mapping
 
 
 class Evaluator(str, Enum):
@@ -13,37 +15,50 @@ class Evaluator(str, Enum):
     DUMMY = "dummy"
 
 
-# Lista de evaluators disponíveis
-AVAILABLE_EVALUATORS: List[str] = [e.value for e in Evaluator]
+# Lista ordenada de evaluators disponíveis
+AVAILABLE_EVALUATORS_LIST: List[str] = [e.value for e in Evaluator]
 
-# Configurações default por evaluator
-EVALUATOR_DEFAULTS = {
-    Evaluator.MEDICAL: {
+# Conjunto de evaluators disponíveis (busca O(1) na validação)
+AVAILABLE_EVALUATORS: FrozenSet[str] = frozenset(AVAILABLE_EVALUATORS_LIST)
+
+# Configurações default por evaluator (somente leitura, indexadas pelo valor em str)
+EVALUATOR_DEFAULTS: Final[Mapping[str, Mapping[str, object]]] = MappingProxyType({
+    Evaluator.MEDICAL.value: MappingProxyType({
         "threshold": 0.8,
         "description": "Avaliação especializada em conteúdo médico e de saúde",
-        "focus": ["alucinações médicas", "informações factualmente incorretas", "conselhos médicos perigosos"]
-    },
-    Evaluator.JURIDICAL: {
+        "focus": ("alucinações médicas", "informações factualmente incorretas", "conselhos médicos perigosos")
+    }),
+    Evaluator.JURIDICAL.value: MappingProxyType({
         "threshold": 0.7,
         "description": "Avaliação especializada em conteúdo jurídico",
-        "focus": ["precisão legal", "jurisprudência", "interpretação de leis"]
-    },
-    Evaluator.DUMMY: {
+        "focus": ("precisão legal", "jurisprudência", "interpretação de leis")
+    }),
+    Evaluator.DUMMY.value: MappingProxyType({
         "threshold": 0.5,
         "description": "Evaluator de teste com avaliação aleatória",
-        "focus": ["teste", "desenvolvimento"]
-    }
-}
+        "focus": ("teste", "desenvolvimento")
+    })
+})
 
 
-def get_evaluator_info(evaluator: str) -> dict:
-    """Obtém informações sobre um evaluator específico"""
+@lru_cache(maxsize=16)
+def get_evaluator_info(evaluator: str) -> Mapping[str, object]:
+    """
+    Obtém informações sobre um evaluator específico
+    
+    O resultado é cacheado e somente leitura, então pode ser compartilhado
+    entre chamadas sem risco de ser alterado pelo chamador.
+    """
+    if isinstance(evaluator, Evaluator):
+        evaluator = evaluator.value
+    
     if evaluator not in AVAILABLE_EVALUATORS:
-        raise ValueError(f"Evaluator '{evaluator}' não disponível. Disponíveis: {AVAILABLE_EVALUATORS}")
+        raise ValueError(f"Evaluator '{evaluator}' não disponível. Disponíveis: {AVAILABLE_EVALUATORS_LIST}")
     
-    return EVALUATOR_DEFAULTS.get(evaluator, {})
+    return EVALUATOR_DEFAULTS.get(evaluator, MappingProxyType({}))
 
 
 def validate_evaluator(evaluator: str) -> bool:
     """Valida se um evaluator é válido"""
+    # Sem lru_cache: a busca no frozenset já é mais rápida que o lookup do cache
     return evaluator in AVAILABLE_EVALUATORS 
\ No newline at end of file
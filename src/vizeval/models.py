@@ -2,21 +2,42 @@
 Modelos de dados para a SDK Vizeval
 """
 
+import sys
 from dataclasses import dataclass, field
-from typing import Dict, Any, Optional
-from pydantic import BaseModel, ConfigDict
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
+import orjson
 
+from .evaluators import Evaluator
+from .exceptions import VizevalAPIError
 
-@dataclass
+# `slots` só é aceito por @dataclass a partir do Python 3.10
+_SLOTS: Dict[str, bool] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@lru_cache(maxsize=8)
+def _adapter(tp: Any) -> Any:
+    """
+    TypeAdapter do pydantic para `tp`, construído uma única vez por tipo
+    
+    Montar o schema a cada chamada custa ordens de grandeza mais que validar;
+    o pydantic só é importado no primeiro uso.
+    """
+    from pydantic import TypeAdapter
+    return TypeAdapter(tp)
+
+
+@dataclass(frozen=True, **_SLOTS)
 class VizevalConfig:
-    """Configuração para integração com Vizeval"""
+    """Configuração para integração com Vizeval (imutável; use set_vizeval_config para trocar)"""
     api_key: str
     evaluator: str = "medical"
     threshold: float = 0.8
     max_retries: int = 3
     base_url: str = "https://api.vizeval.com"
     async_mode: bool = False
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    # Fora do hash (dict não é hashable), mas ainda considerado na igualdade
+    metadata: Dict[str, Any] = field(default_factory=dict, hash=False)
     
     def __post_init__(self):
         if not 0 <= self.threshold <= 1:
@@ -25,27 +46,72 @@ class VizevalConfig:
             raise ValueError("max_retries deve ser maior ou igual a 0")
 
 
-class EvaluationRequest(BaseModel):
+@dataclass(frozen=True, **_SLOTS)
+class EvaluationRequest:
     """Requisição de avaliação para a API Vizeval"""
-    model_config = ConfigDict(arbitrary_types_allowed=True)
-    
     system_prompt: str
     user_prompt: str
     response: str
-    evaluator: str
-    metadata: Dict[str, Any] = {}
+    evaluator: Evaluator
     api_key: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
     async_mode: bool = False
+    
+    def __post_init__(self) -> None:
+        # Aceita o valor em str; evaluators desconhecidos levantam ValueError
+        if not isinstance(self.evaluator, Evaluator):
+            object.__setattr__(self, "evaluator", Evaluator(self.evaluator))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Campos da requisição em um dict raso"""
+        return {name: getattr(self, name) for name in self.__dataclass_fields__}
 
 
-class EvaluationResponse(BaseModel):
-    """Resposta de avaliação da API Vizeval"""
-    model_config = ConfigDict(arbitrary_types_allowed=True)
+@dataclass(frozen=True, **_SLOTS)
+class BatchEvaluationRequest:
+    """Requisição de avaliação em lote para a API Vizeval"""
+    items: List[EvaluationRequest]
+    api_key: str
+
+
+@dataclass(frozen=True)
+class EvaluationBodyTemplate:
+    """Corpo de avaliação pré-serializado em que apenas `response` varia"""
+    prefix: bytes
+    suffix: bytes = b"}"
     
+    def render(self, response: str) -> bytes:
+        """Gera o JSON completo da requisição para uma resposta"""
+        return self.prefix + orjson.dumps(response) + self.suffix
+
+
+@dataclass(frozen=True, **_SLOTS)
+class EvaluationResponse:
+    """Resposta de avaliação da API Vizeval"""
     evaluator: str
     score: Optional[float] = None
     feedback: Optional[str] = None
     
+    @classmethod
+    def from_api(cls, data: Any) -> "EvaluationResponse":
+        """
+        Cria a resposta a partir do JSON decodificado da API
+        
+        Apenas os campos conhecidos são lidos; campos extras são ignorados.
+        
+        Raises:
+            VizevalAPIError: Se o JSON não tiver o formato de uma avaliação
+        """
+        try:
+            score = data.get("score")
+            return cls(
+                evaluator=data["evaluator"],
+                score=float(score) if score is not None else None,
+                feedback=data.get("feedback")
+            )
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            raise VizevalAPIError(f"Resposta de avaliação inválida: {data!r}") from e
+    
     @property
     def is_success(self) -> bool:
         """Verifica se a avaliação foi bem-sucedida"""
@@ -55,6 +121,10 @@ class EvaluationResponse(BaseModel):
         """Verifica se passou do threshold (configurável)"""
         return self.score is not None and self.score >= threshold
 
+    def to_dict(self) -> Dict[str, Any]:
+        """Campos da avaliação em um dict"""
+        return {"evaluator": self.evaluator, "score": self.score, "feedback": self.feedback}
+
 
 @dataclass
 class RetryAttempt:
@@ -65,13 +135,27 @@ class RetryAttempt:
     openai_response: Any
     evaluation_response: EvaluationResponse
     
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Converte a tentativa em um dict serializável em JSON
+        
+        `openai_response` é omitido: o objeto da OpenAI não é serializável e
+        copiá-lo (como faria `dataclasses.asdict`) seria caro.
+        """
+        return {
+            "attempt_number": self.attempt_number,
+            "score": self.score,
+            "feedback": self.feedback,
+            "evaluation_response": self.evaluation_response.to_dict()
+        }
+    
     
 @dataclass
 class VizevalResult:
     """Resultado completo da avaliação Vizeval com histórico de tentativas"""
     final_response: Any  # Resposta final do OpenAI
     final_evaluation: EvaluationResponse
-    attempts: list[RetryAttempt]
+    attempts: List[RetryAttempt]
     config: VizevalConfig
     
     @property
@@ -86,4 +170,21 @@ class VizevalResult:
     def best_score(self) -> Optional[float]:
         """Melhor score obtido em todas as tentativas"""
         scores = [attempt.score for attempt in self.attempts if attempt.score is not None]
-        return max(scores) if scores else None 
\ No newline at end of file
+        return max(scores) if scores else None 
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Converte o resultado em um dict serializável em JSON
+        
+        As respostas da OpenAI e a api_key da configuração são omitidas.
+        """
+        config = self.config
+        return {
+            "final_evaluation": self.final_evaluation.to_dict(),
+            "attempts": [attempt.to_dict() for attempt in self.attempts],
+            "config": {
+                name: getattr(config, name)
+                for name in config.__dataclass_fields__
+                if name != "api_key"
+            }
+        } 
\ No newline at end of file
@@ -2,21 +2,35 @@
 Wrapper transparente para OpenAI com integração automática da avaliação Vizeval
 """
 
-import copy
+import asyncio
+import functools
 import logging
-from typing import Any, Dict, Optional, List, Union
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional, List, Tuple, Union
 from openai import OpenAI as _OpenAI
-from openai.types.chat import ChatCompletion
 
 from .client import VizevalClient
 from .models import VizevalConfig, VizevalResult, RetryAttempt, EvaluationResponse
 from .exceptions import VizevalOpenAIError, VizevalThresholdError, VizevalConfigError
 from .evaluators import validate_evaluator
+from .retry import AdaptiveRetryPolicy
+
+if TYPE_CHECKING:
+    from openai.types.chat import ChatCompletion
 
 # Configurar logging
 logger = logging.getLogger(__name__)
 
 
+def _critique_content(score_str: str) -> str:
+    """Feedback enviado ao modelo quando a resposta fica abaixo do threshold"""
+    # f-string compilada: ~10x mais rápida que str.format_map sobre um template
+    return (
+        "Sua última resposta foi reprovada pela avaliação de qualidade médica. "
+        f"Considerando o score {score_str}, reescreva a resposta anterior para melhorar a qualidade médica."
+    )
+
+
 class OpenAI(_OpenAI):
     """
     Wrapper transparente para OpenAI que integra automaticamente com Vizeval
@@ -29,6 +43,8 @@ class OpenAI(_OpenAI):
         self,
         api_key: Optional[str] = None,
         vizeval_config: Optional[Union[VizevalConfig, Dict[str, Any]]] = None,
+        vizeval_client: Optional[VizevalClient] = None,
+        retry_policy: Optional[AdaptiveRetryPolicy] = None,
         **kwargs
     ):
         """
@@ -37,10 +53,15 @@ class OpenAI(_OpenAI):
         Args:
             api_key: Chave de API do OpenAI
             vizeval_config: Configuração Vizeval ou dict com configurações
+            vizeval_client: Cliente Vizeval já criado, para compartilhar a mesma
+                sessão HTTP entre vários wrappers
+            retry_policy: Política que decide se e quando repetir tentativas
             **kwargs: Argumentos passados para o OpenAI original
         """
         super().__init__(api_key=api_key, **kwargs)
         
+        self.retry_policy = retry_policy or AdaptiveRetryPolicy()
+        
         # Configurar Vizeval
         if isinstance(vizeval_config, dict):
             self.vizeval_config = VizevalConfig(**vizeval_config)
@@ -49,15 +70,21 @@ class OpenAI(_OpenAI):
         else:
             self.vizeval_config = None
         
+        # Clientes injetados pertencem ao chamador e nunca são fechados aqui
+        self._owns_vizeval_client = vizeval_client is None
+        
         # Inicializar cliente Vizeval se configurado
         if self.vizeval_config:
-            self.vizeval_client = VizevalClient(
+            self.vizeval_client = vizeval_client or VizevalClient(
                 api_key=self.vizeval_config.api_key,
                 base_url=self.vizeval_config.base_url
             )
         else:
             self.vizeval_client = None
     
+        # Wrapper de chat criado uma única vez e reaproveitado a cada chamada
+        self._chat_wrapper = ChatWrapper(self)
+    
     def set_vizeval_config(self, config: Union[VizevalConfig, Dict[str, Any]]):
         """
         Define ou atualiza a configuração Vizeval
@@ -72,21 +99,35 @@ class OpenAI(_OpenAI):
         else:
             raise VizevalConfigError("config deve ser VizevalConfig ou dict")
         
-        # Recriar cliente
+        # Reutilizar o cliente (e suas conexões abertas) se apontar para a mesma API
+        client = self.vizeval_client
+        if (
+            client is not None
+            and client.api_key == self.vizeval_config.api_key
+            and client.base_url == self.vizeval_config.base_url.rstrip('/')
+        ):
+            return
+        
+        # Recriar cliente, fechando o anterior se foi criado por este wrapper
+        if client is not None and self._owns_vizeval_client:
+            client.close()
         self.vizeval_client = VizevalClient(
             api_key=self.vizeval_config.api_key,
             base_url=self.vizeval_config.base_url
         )
+        self._owns_vizeval_client = True
     
     def disable_vizeval(self):
         """Desativa a integração Vizeval"""
+        if self.vizeval_client is not None and self._owns_vizeval_client:
+            self.vizeval_client.close()
         self.vizeval_config = None
         self.vizeval_client = None
     
     @property
     def chat(self):
         """Retorna o wrapper de chat que intercepta completions"""
-        return ChatWrapper(self)
+        return self._chat_wrapper
 
 
 class ChatWrapper:
@@ -95,11 +136,12 @@ class ChatWrapper:
     def __init__(self, openai_wrapper: OpenAI):
         self.openai_wrapper = openai_wrapper
         self.original_chat = super(OpenAI, openai_wrapper).chat
+        self._completions_wrapper = CompletionsWrapper(openai_wrapper, self.original_chat.completions)
     
     @property
     def completions(self):
         """Retorna o wrapper de completions"""
-        return CompletionsWrapper(self.openai_wrapper, self.original_chat.completions)
+        return self._completions_wrapper
 
 
 class CompletionsWrapper:
@@ -109,7 +151,7 @@ class CompletionsWrapper:
         self.openai_wrapper = openai_wrapper
         self.original_completions = original_completions
     
-    def create(self, **kwargs) -> Union[ChatCompletion, VizevalResult]:
+    def create(self, **kwargs) -> Union["ChatCompletion", VizevalResult]:
         """
         Intercepta chat.completions.create para integrar com Vizeval
         
@@ -131,6 +173,39 @@ class CompletionsWrapper:
         # Executar com retry automático
         return self._create_with_vizeval_retry(kwargs)
     
+    async def acreate_parallel(self, **kwargs: Any) -> Union["ChatCompletion", VizevalResult]:
+        """
+        Versão assíncrona de create que executa as tentativas em paralelo
+        
+        Em vez de gerar, avaliar e só então repetir, dispara de uma vez as
+        `max_retries + 1` tentativas, cada uma com os parâmetros que o retry
+        sequencial usaria naquela tentativa, e retorna a primeira que atingir o
+        threshold. A latência passa a ser a de uma única tentativa, ao custo de
+        gerar até `max_retries + 1` respostas. Como as tentativas são
+        independentes, o feedback da avaliação não é repassado ao modelo.
+        
+        Args:
+            **kwargs: Argumentos para chat.completions.create
+        
+        Returns:
+            ChatCompletion ou VizevalResult dependendo da configuração
+        """
+        if not self.openai_wrapper.vizeval_config:
+            return await self._run_in_executor(kwargs)
+        
+        if not self._is_evaluable_call(kwargs):
+            logger.warning("Chamada não é avaliável pelo Vizeval, usando OpenAI normalmente")
+            return await self._run_in_executor(kwargs)
+        
+        return await self._create_with_vizeval_parallel(kwargs)
+    
+    async def _run_in_executor(self, kwargs: Dict[str, Any]) -> "ChatCompletion":
+        """Executa a chamada síncrona da OpenAI em uma thread do executor padrão"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(self.original_completions.create, **kwargs)
+        )
+    
     def _is_evaluable_call(self, kwargs: Dict[str, Any]) -> bool:
         """
         Verifica se a chamada pode ser avaliada pelo Vizeval
@@ -142,16 +217,12 @@ class CompletionsWrapper:
             True se pode ser avaliada
         """
         # Verificar se tem messages
-        if "messages" not in kwargs:
-            return False
-        
-        messages = kwargs["messages"]
+        messages = kwargs.get("messages")
         if not messages or not isinstance(messages, list):
             return False
         
-        # Verificar se tem pelo menos uma mensagem do usuário
-        user_messages = [m for m in messages if m.get("role") == "user"]
-        return len(user_messages) > 0
+        # Verificar se tem pelo menos uma mensagem do usuário (para na primeira)
+        return any(m.get("role") == "user" for m in messages)
     
     def _create_with_vizeval_retry(self, kwargs: Dict[str, Any]) -> VizevalResult:
         """
@@ -164,28 +235,39 @@ class CompletionsWrapper:
             VizevalResult com resultado final e histórico
         """
         config = self.openai_wrapper.vizeval_config
-        attempts = []
-        best_response = None
-        best_evaluation = None
-        best_score = 0.0
+        vizeval_client = self.openai_wrapper.vizeval_client
+        retry_policy = self.openai_wrapper.retry_policy
+        # Crescimento por append: para as poucas tentativas de um retry, pré-alocar
+        # [None] * (max_retries + 1) e fatiar no final sai mais caro
+        attempts: List[RetryAttempt] = []
+        # Tentativa avaliada com o maior score até agora
+        best: Optional[RetryAttempt] = None
+        
+        # Os campos fixos da avaliação são serializados uma única vez;
+        # a cada tentativa apenas a resposta do LLM é codificada
+        system_prompt, user_prompt = self._extract_prompts(kwargs["messages"])
+        body_template = vizeval_client._build_body_template(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            evaluator=config.evaluator,
+            metadata=config.metadata,
+            async_mode=config.async_mode
+        )
+        
+        # Escada de temperature/top_p calculada uma única vez para todas as tentativas
+        schedule = self._parameter_schedule(kwargs, config.max_retries)
         
         for attempt in range(config.max_retries + 1):
             try:
                 # Fazer chamada OpenAI
                 response = self.original_completions.create(**kwargs)
                 
-                # Extrair informações para avaliação
-                system_prompt, user_prompt = self._extract_prompts(kwargs["messages"])
+                # Extrair resposta para avaliação
                 llm_response = self._extract_response_content(response)
                 
                 # Avaliar com Vizeval
-                evaluation = self.openai_wrapper.vizeval_client.evaluate(
-                    system_prompt=system_prompt,
-                    user_prompt=user_prompt,
-                    response=llm_response,
-                    evaluator=config.evaluator,
-                    metadata=config.metadata,
-                    async_mode=config.async_mode
+                evaluation = vizeval_client._make_evaluation_request_raw(
+                    body_template.render(llm_response)
                 )
                 
                 # Registrar tentativa
@@ -197,77 +279,186 @@ class CompletionsWrapper:
                     evaluation_response=evaluation
                 )
                 attempts.append(retry_attempt)
+                score = evaluation.score
+                retry_policy.record(config.evaluator)
                 
-                # Verificar se passou do threshold
-                if evaluation.score is not None and evaluation.score >= config.threshold:
-                    logger.info(f"Threshold atingido na tentativa {attempt + 1}: {evaluation.score}")
-                    return VizevalResult(
-                        final_response=response,
-                        final_evaluation=evaluation,
-                        attempts=attempts,
-                        config=config
-                    )
+                if score is not None:
+                    # Verificar se passou do threshold
+                    if score >= config.threshold:
+                        logger.info("Threshold atingido na tentativa %d: %s", attempt + 1, score)
+                        return VizevalResult(
+                            final_response=response,
+                            final_evaluation=evaluation,
+                            attempts=attempts,
+                            config=config
+                        )
                 
-                # Manter melhor resultado
-                if evaluation.score is not None and evaluation.score > best_score:
-                    best_score = evaluation.score
-                    best_response = response
-                    best_evaluation = evaluation
+                    # Manter melhor resultado
+                    if best is None or best.score is None or score > best.score:
+                        best = retry_attempt
                 
                 # Se não é a última tentativa, acrescentar contexto e ajustar parâmetros para retry
                 if attempt < config.max_retries:
-                    # 1) Mensagem do assistente com a resposta reprovada
-                    assistant_msg = {
-                        "role": "assistant",
-                        "content": llm_response
-                    }
-
-                    # 2) Mensagem de crítica/feedback proveniente da avaliação Vizeval
-                    score_str = f"{evaluation.score:.3f}" if evaluation.score is not None else "N/A"
-
-                    critique_content = (
-                        "Sua última resposta foi reprovada pela avaliação de qualidade médica."
-                        "Considerando o score {score_str}, reescreva a resposta anterior para melhorar a qualidade médica."
-                    )
-
-                    critique_msg = {
-                        "role": "system",
-                        "content": critique_content
-                    }
+                    should_retry, _ = retry_policy.should_retry(attempt, evaluator=config.evaluator)
+                    if not should_retry:
+                        break
+                    
+                    score_str = f"{score:.3f}" if score is not None else "N/A"
 
                     # Construir novo array de mensagens incluindo histórico e feedback
-                    new_kwargs = copy.deepcopy(kwargs)
-                    new_kwargs["messages"] = kwargs["messages"] + [assistant_msg, critique_msg]
-
-                    # Ajustar parâmetros (temperature, top_p, etc.) e seguir para próximo retry
-                    kwargs = self._adjust_parameters_for_retry(new_kwargs, attempt + 1)
+                    # (cópia rasa: as mensagens anteriores nunca são alteradas, só a lista é nova)
+                    # e aplicar os parâmetros (temperature, top_p) da próxima tentativa
+                    kwargs = {
+                        **kwargs,
+                        "messages": [
+                            *kwargs["messages"],
+                            # 1) Mensagem do assistente com a resposta reprovada
+                            {"role": "assistant", "content": llm_response},
+                            # 2) Mensagem de crítica/feedback proveniente da avaliação Vizeval
+                            {"role": "system", "content": _critique_content(score_str)},
+                        ],
+                        **schedule[attempt + 1],
+                    }
                     logger.info(
-                        f"Tentativa {attempt + 1} não passou do threshold ({evaluation.score}), tentando novamente com contexto adicional..."
+                        "Tentativa %d não passou do threshold (%s), tentando novamente com contexto adicional...",
+                        attempt + 1, score
                     )
                 
             except Exception as e:
-                logger.error(f"Erro na tentativa {attempt + 1}: {str(e)}")
+                logger.error("Erro na tentativa %d: %s", attempt + 1, e)
+                retry_policy.record(config.evaluator, error=e)
                 # Se der erro, usar a melhor resposta obtida até agora
-                if best_response is not None:
+                if best is not None:
                     break
                 # Se não tem nenhuma resposta válida, propagar erro
                 if attempt == config.max_retries:
                     raise VizevalOpenAIError(f"Todas as tentativas falharam: {str(e)}")
+                
+                # Backoff conforme o tipo de falha; erros irrecuperáveis desistem cedo
+                should_retry, delay = retry_policy.should_retry(
+                    attempt, last_error=e, evaluator=config.evaluator
+                )
+                if not should_retry:
+                    raise VizevalOpenAIError(f"Tentativas interrompidas após erro: {str(e)}")
+                if delay:
+                    time.sleep(delay)
         
         # Se chegou aqui, não conseguiu atingir o threshold
-        if best_response is None:
+        if best is None:
             raise VizevalOpenAIError("Não foi possível obter nenhuma resposta válida")
         
-        logger.warning(f"Threshold não atingido após {config.max_retries + 1} tentativas. Melhor score: {best_score}")
+        logger.warning(
+            "Threshold não atingido após %d tentativas. Melhor score: %s", config.max_retries + 1, best.score
+        )
         
         return VizevalResult(
-            final_response=best_response,
-            final_evaluation=best_evaluation,
+            final_response=best.openai_response,
+            final_evaluation=best.evaluation_response,
             attempts=attempts,
             config=config
         )
     
-    def _extract_prompts(self, messages: List[Dict[str, Any]]) -> tuple[str, str]:
+    async def _create_with_vizeval_parallel(self, kwargs: Dict[str, Any]) -> VizevalResult:
+        """
+        Executa todas as tentativas em paralelo e retorna a primeira aprovada
+        
+        Args:
+            kwargs: Argumentos da chamada
+        
+        Returns:
+            VizevalResult com resultado final e as tentativas concluídas
+        """
+        config = self.openai_wrapper.vizeval_config
+        vizeval_client = self.openai_wrapper.vizeval_client
+        retry_policy = self.openai_wrapper.retry_policy
+        
+        system_prompt, user_prompt = self._extract_prompts(kwargs["messages"])
+        body_template = vizeval_client._build_body_template(
+            system_prompt=system_prompt,
+            user_prompt=user_prompt,
+            evaluator=config.evaluator,
+            metadata=config.metadata,
+            async_mode=config.async_mode
+        )
+        
+        # Parâmetros de cada tentativa, na mesma escada do retry sequencial
+        param_sweep = [
+            {**kwargs, **overrides}
+            for overrides in self._parameter_schedule(kwargs, config.max_retries)
+        ]
+        
+        async def run_attempt(attempt_number: int, attempt_kwargs: Dict[str, Any]) -> RetryAttempt:
+            response = await self._run_in_executor(attempt_kwargs)
+            evaluation = await vizeval_client._amake_evaluation_request_raw(
+                body_template.render(self._extract_response_content(response))
+            )
+            return RetryAttempt(
+                attempt_number=attempt_number,
+                score=evaluation.score,
+                feedback=evaluation.feedback,
+                openai_response=response,
+                evaluation_response=evaluation
+            )
+        
+        tasks = [
+            asyncio.ensure_future(run_attempt(i + 1, attempt_kwargs))
+            for i, attempt_kwargs in enumerate(param_sweep)
+        ]
+        attempts = []
+        best = None
+        last_error = None
+        
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    retry_attempt = await next_done
+                except Exception as e:
+                    logger.error("Erro em tentativa paralela: %s", e)
+                    retry_policy.record(config.evaluator, error=e)
+                    last_error = e
+                    continue
+                
+                attempts.append(retry_attempt)
+                retry_policy.record(config.evaluator)
+                
+                if retry_attempt.score is not None and retry_attempt.score >= config.threshold:
+                    logger.info(
+                        "Threshold atingido na tentativa paralela %d: %s",
+                        retry_attempt.attempt_number, retry_attempt.score
+                    )
+                    return VizevalResult(
+                        final_response=retry_attempt.openai_response,
+                        final_evaluation=retry_attempt.evaluation_response,
+                        attempts=sorted(attempts, key=lambda a: a.attempt_number),
+                        config=config
+                    )
+                
+                score = retry_attempt.score
+                if score is not None and (best is None or best.score is None or score > best.score):
+                    best = retry_attempt
+        finally:
+            # As chamadas à OpenAI já iniciadas terminam na thread, mas seus
+            # resultados são descartados
+            for task in tasks:
+                task.cancel()
+        
+        if best is None:
+            if not attempts:
+                raise VizevalOpenAIError(f"Todas as tentativas falharam: {str(last_error)}")
+            raise VizevalOpenAIError("Não foi possível obter nenhuma resposta válida")
+        
+        logger.warning(
+            "Threshold não atingido em %d tentativas paralelas. Melhor score: %s", len(tasks), best.score
+        )
+        
+        return VizevalResult(
+            final_response=best.openai_response,
+            final_evaluation=best.evaluation_response,
+            attempts=sorted(attempts, key=lambda a: a.attempt_number),
+            config=config
+        )
+    
+    def _extract_prompts(self, messages: List[Dict[str, Any]]) -> Tuple[str, str]:
         """
         Extrai system_prompt e user_prompt das mensagens
         
@@ -278,21 +469,20 @@ class CompletionsWrapper:
             Tuple com (system_prompt, user_prompt)
         """
         system_prompt = ""
-        user_prompt = ""
+        user_contents = []
         
         for message in messages:
             role = message.get("role", "")
-            content = message.get("content", "")
             
             if role == "system":
-                system_prompt = content
+                system_prompt = message.get("content", "")
             elif role == "user":
-                # Concatenar mensagens do usuário
-                user_prompt += content + "\n"
+                user_contents.append(message.get("content", ""))
         
-        return system_prompt.strip(), user_prompt.strip()
+        # Concatenar mensagens do usuário com um único join (sem += quadrático)
+        return system_prompt.strip(), "\n".join(user_contents).strip()
     
-    def _extract_response_content(self, response: ChatCompletion) -> str:
+    def _extract_response_content(self, response: "ChatCompletion") -> str:
         """
         Extrai o conteúdo da resposta do OpenAI
         
@@ -302,35 +492,46 @@ class CompletionsWrapper:
         Returns:
             Conteúdo da resposta
         """
+        # Sem exceção no caminho comum; lista de choices vazia (ex.: filtro de
+        # conteúdo) é tratada com um teste em vez de IndexError
         try:
-            return response.choices[0].message.content or ""
-        except (IndexError, AttributeError):
+            choices = response.choices
+            return choices[0].message.content or "" if choices else ""
+        except AttributeError:
             return ""
     
-    def _adjust_parameters_for_retry(self, kwargs: Dict[str, Any], attempt: int) -> Dict[str, Any]:
+    def _parameter_schedule(self, kwargs: Dict[str, Any], max_retries: int) -> List[Dict[str, Any]]:
         """
-        Ajusta parâmetros para retry (pode aumentar temperature, etc.)
+        Calcula os parâmetros ajustados de cada tentativa (aumenta temperature, etc.)
         
         Args:
             kwargs: Argumentos originais
-            attempt: Número da tentativa
+            max_retries: Número máximo de retries
             
         Returns:
-            Novos argumentos ajustados
+            Lista com `max_retries + 1` dicts de parâmetros a sobrescrever; o
+            índice 0 (chamada original) é vazio e cada entrada é cumulativa
         """
-        new_kwargs = copy.deepcopy(kwargs)
+        schedule: List[Dict[str, Any]] = [{}]
+        temperature = kwargs.get("temperature")
+        if temperature is None:
+            temperature = 0.7
+        top_p = kwargs.get("top_p")
+        overrides: Dict[str, Any] = {}
+        
+        for _ in range(max_retries):
+            overrides = dict(overrides)
         
-        # Ajustar temperature gradualmente
-        current_temp = new_kwargs.get("temperature", 0.7)
+            # Aumentar temperature em pequenos incrementos
+            if temperature < 0.9:
+                temperature = min(0.9, temperature + 0.1)
+                overrides["temperature"] = temperature
         
-        # Aumentar temperature em pequenos incrementos
-        if current_temp < 0.9:
-            new_kwargs["temperature"] = min(0.9, current_temp + 0.1)
+            # Ajustar top_p se necessário
+            if top_p is not None and top_p < 0.95:
+                top_p = min(0.95, top_p + 0.05)
+                overrides["top_p"] = top_p
         
-        # Ajustar top_p se necessário
-        if "top_p" in new_kwargs:
-            current_top_p = new_kwargs["top_p"]
-            if current_top_p < 0.95:
-                new_kwargs["top_p"] = min(0.95, current_top_p + 0.05)
+            schedule.append(overrides)
         
-        return new_kwargs 
\ No newline at end of file
+        return schedule 
\ No newline at end of file
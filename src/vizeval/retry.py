@@ -0,0 +1,159 @@
+"""
+Política de retry adaptativa para o wrapper OpenAI
+"""
+
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, Optional, Tuple, Union
+
+import httpx
+
+from .evaluators import Evaluator
+from .exceptions import VizevalConfigError
+
+
+class FailureType(str, Enum):
+    """Tipos de falha considerados pela política de retry"""
+    RATE_LIMITED = "rate_limited"
+    TIMEOUT = "timeout"
+    SERVER_ERROR = "server_error"
+    INVALID_DATA = "invalid_data"
+    UNKNOWN = "unknown"
+
+
+# Multiplicador do backoff exponencial por tipo de falha
+FAILURE_MULTIPLIERS: Dict[FailureType, float] = {
+    FailureType.RATE_LIMITED: 3.0,
+    FailureType.TIMEOUT: 1.5,
+    FailureType.SERVER_ERROR: 1.0,
+    FailureType.INVALID_DATA: 0.5,
+    FailureType.UNKNOWN: 1.0,
+}
+
+
+def classify_error(error: BaseException) -> FailureType:
+    """Classifica uma exceção da OpenAI ou da API Vizeval em um FailureType"""
+    if isinstance(error, VizevalConfigError):
+        return FailureType.INVALID_DATA
+    
+    # Erros de transporte chegam encadeados nas exceções da OpenAI e da Vizeval
+    cause = error.__cause__ or error.__context__
+    if isinstance(error, (TimeoutError, httpx.TimeoutException)) or isinstance(
+        cause, (TimeoutError, httpx.TimeoutException)
+    ):
+        return FailureType.TIMEOUT
+    
+    # VizevalAPIError e openai.APIStatusError expõem status_code
+    status_code = getattr(error, "status_code", None)
+    if status_code == 429:
+        return FailureType.RATE_LIMITED
+    if isinstance(status_code, int) and status_code >= 500:
+        return FailureType.SERVER_ERROR
+    if isinstance(status_code, int) and 400 <= status_code < 500:
+        return FailureType.INVALID_DATA
+    
+    return FailureType.UNKNOWN
+
+
+@dataclass
+class RetryStats:
+    """Histórico recente de resultados de um evaluator"""
+    # Média móvel exponencial, por tipo, da fração de tentativas que falharam
+    # com aquele tipo; sucessos e falhas de outros tipos a fazem decair
+    failure_rates: Dict[FailureType, float] = field(default_factory=dict)
+
+
+class AdaptiveRetryPolicy:
+    """
+    Decide se e quando repetir uma tentativa com base no tipo de falha
+    
+    Falhas de requisição usam backoff exponencial ponderado pelo tipo de falha
+    (rate limit espera mais, dados inválidos desistem cedo) e pela frequência
+    recente desse tipo de falha no evaluator, que decai à medida que novas
+    tentativas dão certo. Respostas avaliadas abaixo do threshold são
+    repetidas imediatamente.
+    """
+    
+    def __init__(self, base_delay: float = 0.5, max_delay: float = 30.0, failure_alpha: float = 0.3):
+        """
+        Args:
+            base_delay: Espera base (em segundos) do backoff exponencial
+            max_delay: Espera máxima entre tentativas
+            failure_alpha: Peso da tentativa mais recente na taxa de falhas
+                por tipo (entre 0 e 1, exclusivo)
+        
+        Raises:
+            VizevalConfigError: Se failure_alpha estiver fora de (0, 1)
+        """
+        if not 0 < failure_alpha < 1:
+            raise VizevalConfigError("failure_alpha deve estar entre 0 e 1")
+        
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_alpha = failure_alpha
+        self._stats: Dict[str, RetryStats] = {}
+    
+    def stats(self, evaluator: Union[str, Evaluator]) -> RetryStats:
+        """Retorna o histórico de um evaluator"""
+        key = evaluator.value if isinstance(evaluator, Evaluator) else evaluator
+        if key not in self._stats:
+            self._stats[key] = RetryStats()
+        return self._stats[key]
+    
+    def record(
+        self,
+        evaluator: Union[str, Evaluator],
+        error: Optional[BaseException] = None
+    ) -> None:
+        """
+        Registra o resultado de uma tentativa
+        
+        Args:
+            evaluator: Evaluator usado na tentativa
+            error: Exceção levantada, se a tentativa falhou
+        """
+        stats = self.stats(evaluator)
+        failure_type = classify_error(error) if error is not None else None
+        
+        for known_type in FailureType:
+            rate = stats.failure_rates.get(known_type, 0.0)
+            hit = 1.0 if known_type is failure_type else 0.0
+            stats.failure_rates[known_type] = self.failure_alpha * hit + (1 - self.failure_alpha) * rate
+    
+    def should_retry(
+        self,
+        attempt: int,
+        last_error: Optional[BaseException] = None,
+        evaluator: Union[str, Evaluator] = Evaluator.MEDICAL
+    ) -> Tuple[bool, float]:
+        """
+        Decide se uma nova tentativa deve ser feita
+        
+        Args:
+            attempt: Índice (a partir de 0) da tentativa que acabou de terminar
+            last_error: Exceção da última tentativa, ou None se a resposta foi
+                avaliada mas ficou abaixo do threshold
+            evaluator: Evaluator em uso
+        
+        Returns:
+            Tuple com (deve repetir, espera em segundos antes da nova tentativa)
+        """
+        # Resposta avaliada abaixo do threshold: repetir imediatamente
+        if last_error is None:
+            return True, 0.0
+        
+        failure_type = classify_error(last_error)
+        
+        # Dados inválidos dificilmente se resolvem sozinhos: uma única nova tentativa
+        if failure_type is FailureType.INVALID_DATA and attempt > 0:
+            return False, 0.0
+        
+        # Falhas recentes do mesmo tipo alongam a espera. A falha atual já foi
+        # registrada por record() e é retirada da média; o teto de 0.9 limita
+        # a pressão a 10x
+        rate = self.stats(evaluator).failure_rates.get(failure_type, 0.0)
+        previous_rate = max((rate - self.failure_alpha) / (1 - self.failure_alpha), 0.0)
+        pressure = 1 / (1 - min(previous_rate, 0.9))
+        
+        delay = self.base_delay * (2 ** attempt) * FAILURE_MULTIPLIERS[failure_type] * pressure
+        return True, min(delay, self.max_delay) 
\ No newline at end of file
@@ -2,8 +2,14 @@
 Testes básicos para a SDK Vizeval
 """
 
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+import orjson
 import pytest
-from unittest.mock import Mock, patch
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import AsyncMock, Mock, patch
 from vizeval import VizevalClient, VizevalConfig, Evaluator
 from vizeval.models import EvaluationRequest, EvaluationResponse
 from vizeval.exceptions import VizevalConfigError, VizevalAPIError
@@ -35,6 +41,16 @@ class TestVizevalConfig:
         # Max retries inválido
         with pytest.raises(ValueError, match="max_retries deve ser maior ou igual a 0"):
             VizevalConfig(api_key="test", max_retries=-1)
+    
+    def test_config_is_frozen_and_hashable(self):
+        """Testa que a configuração é imutável e pode ser usada como chave"""
+        from dataclasses import FrozenInstanceError
+        
+        config = VizevalConfig(api_key="test", metadata={"user_id": "123"})
+        
+        with pytest.raises(FrozenInstanceError):
+            config.threshold = 0.5
+        assert hash(config) == hash(VizevalConfig(api_key="test", metadata={"user_id": "123"}))
 
 
 class TestVizevalClient:
@@ -51,17 +67,17 @@ class TestVizevalClient:
         with pytest.raises(VizevalConfigError, match="api_key é obrigatório"):
             VizevalClient(api_key="")
     
-    @patch('vizeval.client.requests.Session.post')
+    @patch('vizeval.client.httpx.Client.post')
     def test_evaluate_success(self, mock_post):
         """Testa avaliação bem-sucedida"""
         # Mock da resposta
         mock_response = Mock()
         mock_response.status_code = 201
-        mock_response.json.return_value = {
+        mock_response.content = orjson.dumps({
             "evaluator": "medical",
             "score": 0.85,
             "feedback": "Resposta adequada"
-        }
+        })
         mock_post.return_value = mock_response
         
         client = VizevalClient(api_key="test_key")
@@ -76,17 +92,43 @@ class TestVizevalClient:
         assert result.feedback == "Resposta adequada"
         assert result.evaluator == "medical"
     
-    @patch('vizeval.client.requests.Session.post')
+    @patch('vizeval.client.httpx.Client.post')
+    def test_evaluate_cache(self, mock_post):
+        """Testa que avaliações idênticas são servidas do cache"""
+        mock_response = Mock()
+        mock_response.status_code = 201
+        mock_response.content = orjson.dumps({"evaluator": "medical", "score": 0.85})
+        mock_post.return_value = mock_response
+        
+        client = VizevalClient(api_key="test_key")
+        kwargs = {"system_prompt": "s", "user_prompt": "u", "response": "r"}
+        
+        first = client.evaluate(**kwargs)
+        second = client.evaluate(**kwargs, evaluator=Evaluator.MEDICAL)
+        assert second is first
+        assert mock_post.call_count == 1
+        
+        client.evaluate(**kwargs, cache=False)
+        client.evaluate(**kwargs, evaluator="dummy")
+        assert mock_post.call_count == 3
+        
+        # Metadados entram na chave, independentemente da ordem das chaves
+        client.evaluate(**kwargs, metadata={"user_id": "a", "origem": "chat"})
+        client.evaluate(**kwargs, metadata={"origem": "chat", "user_id": "a"})
+        client.evaluate(**kwargs, metadata={"user_id": "b", "origem": "chat"})
+        assert mock_post.call_count == 5
+    
+    @patch('vizeval.client.httpx.Client.post')
     def test_evaluate_api_error(self, mock_post):
         """Testa erro na API"""
         mock_response = Mock()
         mock_response.status_code = 400
-        mock_response.json.return_value = {"detail": "Erro de validação"}
+        mock_response.content = orjson.dumps({"detail": "Erro de validação"})
         mock_post.return_value = mock_response
         
         client = VizevalClient(api_key="test_key")
         
-        with pytest.raises(VizevalAPIError):
+        with pytest.raises(VizevalAPIError, match="Erro de validação") as exc_info:
             client.evaluate(
                 system_prompt="test",
                 user_prompt="test",
@@ -94,6 +136,224 @@ class TestVizevalClient:
                 evaluator="medical"
             )
     
+        assert exc_info.value.status_code == 400
+        assert exc_info.value.response_data == {"detail": "Erro de validação"}
+    
+    @patch('vizeval.client.httpx.Client.post')
+    def test_evaluate_invalid_success_body(self, mock_post):
+        """Testa resposta 201 com corpo que não é JSON"""
+        mock_response = Mock()
+        mock_response.status_code = 201
+        mock_response.content = b"<html>"
+        mock_post.return_value = mock_response
+        
+        client = VizevalClient(api_key="test_key")
+        
+        with pytest.raises(VizevalAPIError, match="Erro ao parsear resposta da API"):
+            client.evaluate(system_prompt="test", user_prompt="test", response="test")
+    
+    @patch('vizeval.client.httpx.Client.post')
+    def test_evaluate_without_msgspec(self, mock_post):
+        """Testa a decodificação via orjson quando o msgspec não está instalado"""
+        mock_response = Mock()
+        mock_response.status_code = 201
+        mock_response.content = orjson.dumps({"evaluator": "medical", "score": 0.85, "feedback": "Ok"})
+        mock_post.return_value = mock_response
+        
+        client = VizevalClient(api_key="test_key")
+        
+        with patch('vizeval.client._EVALUATION_DECODER', None):
+            result = client.evaluate(system_prompt="test", user_prompt="test", response="test")
+        
+        assert result == EvaluationResponse(evaluator="medical", score=0.85, feedback="Ok")
+    
+    @patch('vizeval.client.httpx.Client.post')
+    def test_evaluate_accepts_string_score(self, mock_post):
+        """Testa que o score em string é aceito com e sem o msgspec"""
+        mock_response = Mock()
+        mock_response.status_code = 201
+        mock_response.content = orjson.dumps({"evaluator": "medical", "score": "0.9"})
+        mock_post.return_value = mock_response
+        
+        client = VizevalClient(api_key="test_key")
+        
+        result = client.evaluate(system_prompt="test", user_prompt="test", response="test")
+        with patch('vizeval.client._EVALUATION_DECODER', None):
+            fallback = client.evaluate(system_prompt="test", user_prompt="test", response="test")
+        
+        assert result == fallback == EvaluationResponse(evaluator="medical", score=0.9)
+    
+    @patch('vizeval.client.httpx.Client.get')
+    def test_get_user_evaluations_sends_key_in_header(self, mock_get):
+        """Testa que a API key vai no header, não na query string"""
+        mock_response = Mock()
+        mock_response.status_code = 200
+        mock_response.content = orjson.dumps([{"evaluator": "medical", "score": 0.9}])
+        mock_get.return_value = mock_response
+        
+        client = VizevalClient(api_key="test_key")
+        evaluations = client.get_user_evaluations()
+        
+        assert evaluations == [{"evaluator": "medical", "score": 0.9}]
+        assert client.session.headers["X-API-Key"] == "test_key"
+        assert "params" not in mock_get.call_args.kwargs
+    
+    @patch('vizeval.client.httpx.Client.get')
+    def test_get_user_evaluations_non_json_error(self, mock_get):
+        """Testa que um corpo de erro não-JSON não mascara o erro HTTP"""
+        mock_response = Mock()
+        mock_response.status_code = 502
+        mock_response.content = b"<html>Bad Gateway</html>"
+        mock_get.return_value = mock_response
+        
+        client = VizevalClient(api_key="test_key")
+        
+        with pytest.raises(VizevalAPIError, match="502") as exc_info:
+            client.get_user_evaluations()
+        
+        assert exc_info.value.status_code == 502
+        assert exc_info.value.response_data == {}
+    
+    @patch('vizeval.client.httpx.Client.post')
+    def test_evaluate_batch(self, mock_post):
+        """Testa avaliação em lote com uma única requisição"""
+        mock_response = Mock()
+        mock_response.status_code = 201
+        mock_response.content = orjson.dumps([
+            {"evaluator": "medical", "score": 0.85, "feedback": "Boa"},
+            {"evaluator": "dummy", "score": 0.4, "feedback": None},
+        ])
+        mock_post.return_value = mock_response
+        
+        client = VizevalClient(api_key="test_key")
+        results = client.evaluate_batch([
+            {"system_prompt": "s", "user_prompt": "u", "response": "r", "evaluator": "medical"},
+            {"system_prompt": "s", "user_prompt": "u", "response": "r", "evaluator": "dummy"},
+        ])
+        
+        assert mock_post.call_count == 1
+        assert mock_post.call_args[0][0].endswith("/evaluation/batch")
+        assert [r.evaluator for r in results] == ["medical", "dummy"]
+        assert results[0].score == 0.85
+    
+    @patch('vizeval.client.httpx.Client.post')
+    def test_evaluate_batch_invalid_item(self, mock_post):
+        """Testa que um item fora do formato de avaliação gera VizevalAPIError"""
+        mock_response = Mock()
+        mock_response.status_code = 201
+        mock_response.content = orjson.dumps([{"evaluator": "medical", "score": 0.85}, {"score": 0.4}])
+        mock_post.return_value = mock_response
+        
+        client = VizevalClient(api_key="test_key")
+        
+        with pytest.raises(VizevalAPIError, match="Resposta de avaliação inválida"):
+            client.evaluate_batch([
+                {"system_prompt": "s", "user_prompt": "u", "response": "r"},
+                {"system_prompt": "s", "user_prompt": "u", "response": "r"},
+            ])
+    
+    @patch('vizeval.client.httpx.AsyncClient.post', new_callable=AsyncMock)
+    def test_aevaluate_many(self, mock_post):
+        """Testa avaliações concorrentes com o cliente assíncrono"""
+        mock_response = Mock()
+        mock_response.status_code = 201
+        mock_response.content = orjson.dumps({
+            "evaluator": "medical",
+            "score": 0.9,
+            "feedback": "Ok"
+        })
+        mock_post.return_value = mock_response
+        
+        client = VizevalClient(api_key="test_key")
+        items = [
+            {"system_prompt": "s", "user_prompt": "u", "response": "r1"},
+            {"system_prompt": "s", "user_prompt": "u", "response": "r2"},
+        ]
+        
+        async def run():
+            try:
+                return await client.aevaluate_many(items)
+            finally:
+                await client.aclose()
+        
+        results = asyncio.run(run())
+        
+        assert [r.score for r in results] == [0.9, 0.9]
+        assert mock_post.await_count == 2
+    
+    def test_body_template_matches_full_request(self):
+        """Testa que o template pré-serializado gera o mesmo JSON da requisição completa"""
+        client = VizevalClient(api_key="test_key")
+        template = client._build_body_template(
+            system_prompt="Você é um médico",
+            user_prompt="Quais são os sintomas?",
+            metadata={"user_id": "123"}
+        )
+        request = client._build_request(
+            system_prompt="Você é um médico",
+            user_prompt="Quais são os sintomas?",
+            response='Febre "alta"',
+            metadata={"user_id": "123"}
+        )
+        
+        assert orjson.loads(template.render('Febre "alta"')) == orjson.loads(orjson.dumps(request))
+    
+    def test_async_session_is_bound_to_event_loop(self):
+        """Testa que o cliente assíncrono é recriado em outro event loop e descartado no close"""
+        client = VizevalClient(api_key="test_key")
+        
+        async def get_session():
+            first = client._get_async_session()
+            assert client._get_async_session() is first
+            return first
+        
+        first = asyncio.run(get_session())
+        second = asyncio.run(get_session())
+        
+        assert second is not first
+        
+        client.close()
+        assert len(client._async_sessions) == 0
+    
+    def test_async_sessions_are_isolated_between_threads(self):
+        """Testa que um loop em outra thread não fecha o cliente assíncrono de um loop ativo"""
+        client = VizevalClient(api_key="test_key")
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        
+        async def get_session():
+            return client._get_async_session()
+        
+        try:
+            background = asyncio.run_coroutine_threadsafe(get_session(), loop).result(timeout=5)
+            foreground = asyncio.run(get_session())
+            
+            assert foreground is not background
+            assert asyncio.run_coroutine_threadsafe(get_session(), loop).result(timeout=5) is background
+            assert not background.is_closed
+            
+            # O close agenda o fechamento no próprio loop do cliente
+            client.close()
+            asyncio.run_coroutine_threadsafe(asyncio.sleep(0.05), loop).result(timeout=5)
+            assert len(client._async_sessions) == 0
+            assert background.is_closed
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=5)
+            loop.close()
+    
+    @patch('vizeval.client.httpx.Client.head')
+    def test_health_check_is_cached(self, mock_head):
+        """Testa que o health check usa HEAD e reaproveita o resultado"""
+        mock_head.return_value = Mock(status_code=200)
+        
+        client = VizevalClient(api_key="test_key")
+        
+        assert client.health_check() is True
+        assert client.health_check() is True
+        assert mock_head.call_count == 1
+    
     def test_evaluate_invalid_evaluator(self):
         """Testa avaliação com evaluator inválido"""
         client = VizevalClient(api_key="test_key")
@@ -126,6 +386,64 @@ class TestEvaluationModels:
         assert request.evaluator == "medical"
         assert request.api_key == "test_key"
     
+    def test_evaluation_request_rejects_unknown_evaluator(self):
+        """Testa que o modelo de requisição valida o evaluator"""
+        with pytest.raises(ValueError):
+            EvaluationRequest(
+                system_prompt="test",
+                user_prompt="test",
+                response="test",
+                evaluator="invalid",
+                api_key="test_key"
+            )
+    
+    def test_model_fields(self):
+        """Testa os campos trocados com a API, para detectar mudanças de schema"""
+        from dataclasses import fields
+        
+        assert {f.name for f in fields(EvaluationRequest)} == {
+            "system_prompt", "user_prompt", "response", "evaluator", "metadata", "api_key", "async_mode"
+        }
+        assert {f.name for f in fields(EvaluationResponse)} == {"evaluator", "score", "feedback"}
+    
+    def test_evaluation_response_from_api(self):
+        """Testa a conversão do JSON da API em EvaluationResponse"""
+        response = EvaluationResponse.from_api(
+            {"evaluator": "medical", "score": 1, "feedback": "Boa", "extra": True}
+        )
+        
+        assert response == EvaluationResponse(evaluator="medical", score=1.0, feedback="Boa")
+        
+        with pytest.raises(VizevalAPIError, match="Resposta de avaliação inválida"):
+            EvaluationResponse.from_api({"score": 0.5})
+    
+    def test_result_to_dict(self):
+        """Testa a serialização do resultado sem a resposta da OpenAI nem a api_key"""
+        from vizeval.models import RetryAttempt, VizevalResult
+        
+        evaluation = EvaluationResponse(evaluator="medical", score=0.9, feedback="Boa")
+        attempt = RetryAttempt(
+            attempt_number=1,
+            score=0.9,
+            feedback="Boa",
+            openai_response=Mock(),
+            evaluation_response=evaluation
+        )
+        result = VizevalResult(
+            final_response=Mock(),
+            final_evaluation=evaluation,
+            attempts=[attempt],
+            config=VizevalConfig(api_key="test_key")
+        )
+        
+        data = orjson.loads(orjson.dumps(result.to_dict()))
+        
+        assert data["final_evaluation"] == {"evaluator": "medical", "score": 0.9, "feedback": "Boa"}
+        assert data["attempts"][0]["attempt_number"] == 1
+        assert "openai_response" not in data["attempts"][0]
+        assert "api_key" not in data["config"]
+        assert data["config"]["threshold"] == 0.8
+    
     def test_evaluation_response_properties(self):
         """Testa propriedades da resposta de avaliação"""
         # Resposta com score
@@ -150,6 +468,368 @@ class TestEvaluationModels:
         assert response_no_score.passed_threshold(0.8) is False
 
 
+class TestOpenAIWrapper:
+    """Testes para o wrapper OpenAI"""
+    
+    def test_shared_vizeval_client(self):
+        """Testa que um cliente Vizeval injetado é reutilizado"""
+        from vizeval import OpenAI
+        
+        vizeval_client = VizevalClient(api_key="test_key")
+        config = VizevalConfig(api_key="test_key")
+        
+        first = OpenAI(api_key="sk-test", vizeval_config=config, vizeval_client=vizeval_client)
+        second = OpenAI(api_key="sk-test", vizeval_config=config, vizeval_client=vizeval_client)
+        
+        assert first.vizeval_client is vizeval_client
+        assert second.vizeval_client is vizeval_client
+
+    def test_openai_sdk_is_imported_lazily(self):
+        """Testa que importar vizeval não carrega o SDK da OpenAI até o uso do wrapper"""
+        import subprocess
+        import sys
+        
+        code = (
+            "import sys, vizeval\n"
+            "assert 'openai' not in sys.modules\n"
+            "from vizeval import OpenAI\n"
+            "assert 'openai' in sys.modules\n"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True)
+    
+    def test_set_vizeval_config_reuses_client(self):
+        """Testa que reconfigurar com a mesma API mantém o cliente e suas conexões"""
+        from vizeval import OpenAI
+        
+        shared = VizevalClient(api_key="test_key")
+        client = OpenAI(api_key="sk-test", vizeval_config=VizevalConfig(api_key="test_key"), vizeval_client=shared)
+        
+        client.set_vizeval_config({"api_key": "test_key", "threshold": 0.9})
+        assert client.vizeval_client is shared
+        
+        # Cliente injetado não é fechado ao trocar de api_key
+        with patch.object(VizevalClient, "close") as mock_close:
+            client.set_vizeval_config({"api_key": "other_key"})
+            assert client.vizeval_client is not shared
+            mock_close.assert_not_called()
+            
+            # Cliente criado pelo wrapper é fechado ao ser substituído
+            client.set_vizeval_config({"api_key": "third_key"})
+            mock_close.assert_called_once()
+    
+    def test_chat_wrappers_are_reused(self):
+        """Testa que os wrappers de chat e completions são criados uma única vez"""
+        from vizeval import OpenAI
+        
+        client = OpenAI(api_key="sk-test", vizeval_config=VizevalConfig(api_key="test_key"))
+        
+        assert client.chat is client.chat
+        assert client.chat.completions is client.chat.completions
+
+
+class TestRetryLoop:
+    """Testes para o loop de retry do wrapper OpenAI"""
+    
+    def _make_completions(self, max_retries=2, **config_kwargs):
+        """Cria um CompletionsWrapper com a chamada OpenAI simulada"""
+        from vizeval import OpenAI
+        from vizeval.openai_wrapper import CompletionsWrapper
+        
+        openai_wrapper = OpenAI(
+            api_key="sk-test",
+            vizeval_config=VizevalConfig(api_key="test_key", threshold=0.8, max_retries=max_retries, **config_kwargs)
+        )
+        original_completions = Mock()
+        original_completions.create.return_value = Mock(
+            choices=[Mock(message=Mock(content="Febre e tosse"))]
+        )
+        return CompletionsWrapper(openai_wrapper, original_completions), original_completions
+    
+    def test_retries_until_threshold(self):
+        """Testa que o loop repete com contexto adicional até atingir o threshold"""
+        completions, original_completions = self._make_completions()
+        evaluations = [
+            EvaluationResponse(evaluator="medical", score=0.5, feedback="Fraca"),
+            EvaluationResponse(evaluator="medical", score=0.9, feedback="Boa"),
+        ]
+        messages = [{"role": "user", "content": "Quais são os sintomas da gripe?"}]
+        
+        with patch.object(VizevalClient, "_make_evaluation_request_raw", side_effect=evaluations):
+            result = completions.create(model="gpt-4", messages=messages)
+        
+        assert result.total_attempts == 2
+        assert result.final_evaluation.score == 0.9
+        retry_messages = original_completions.create.call_args_list[1].kwargs["messages"]
+        assert [m["role"] for m in retry_messages] == ["user", "assistant", "system"]
+        assert "score 0.500" in retry_messages[2]["content"]
+        # A lista do chamador não é alterada; as mensagens são reaproveitadas
+        assert len(messages) == 1
+        assert retry_messages[0] is messages[0]
+    
+    def test_retry_logs_use_lazy_formatting(self, caplog):
+        """Testa que os logs do retry passam argumentos em vez de strings já formatadas"""
+        completions, _ = self._make_completions()
+        evaluations = [
+            EvaluationResponse(evaluator="medical", score=0.5),
+            EvaluationResponse(evaluator="medical", score=0.9),
+        ]
+        messages = [{"role": "user", "content": "Quais são os sintomas da gripe?"}]
+        
+        with caplog.at_level("INFO", logger="vizeval.openai_wrapper"):
+            with patch.object(VizevalClient, "_make_evaluation_request_raw", side_effect=evaluations):
+                completions.create(model="gpt-4", messages=messages)
+        
+        assert len(caplog.records) == 2
+        assert all(record.args for record in caplog.records)
+    
+    def test_returns_best_attempt_below_threshold(self):
+        """Testa que, sem atingir o threshold, a tentativa de maior score é retornada"""
+        completions, _ = self._make_completions()
+        evaluations = [
+            EvaluationResponse(evaluator="medical", score=0.4),
+            EvaluationResponse(evaluator="medical", score=0.6),
+            EvaluationResponse(evaluator="medical", score=0.5),
+        ]
+        messages = [{"role": "user", "content": "Quais são os sintomas da gripe?"}]
+        
+        with patch.object(VizevalClient, "_make_evaluation_request_raw", side_effect=evaluations):
+            result = completions.create(model="gpt-4", messages=messages)
+        
+        assert result.total_attempts == 3
+        assert result.final_evaluation is evaluations[1]
+    
+    @patch('vizeval.openai_wrapper.time.sleep')
+    def test_invalid_data_gives_up_early(self, mock_sleep):
+        """Testa que erros de dados inválidos interrompem o retry antes de max_retries"""
+        from vizeval.exceptions import VizevalOpenAIError
+        
+        completions, original_completions = self._make_completions(max_retries=5)
+        error = VizevalAPIError("Erro na API Vizeval: 422", status_code=422)
+        messages = [{"role": "user", "content": "Quais são os sintomas da gripe?"}]
+        
+        with patch.object(VizevalClient, "_make_evaluation_request_raw", side_effect=error):
+            with pytest.raises(VizevalOpenAIError):
+                completions.create(model="gpt-4", messages=messages)
+        
+        assert original_completions.create.call_count == 2
+    
+    def test_acreate_parallel_returns_first_passing_attempt(self):
+        """Testa que as tentativas paralelas usam a escada de parâmetros e param no threshold"""
+        completions, original_completions = self._make_completions()
+        original_completions.create.side_effect = lambda **kw: Mock(
+            choices=[Mock(message=Mock(content="boa" if kw["temperature"] > 0.85 else "fraca"))]
+        )
+        
+        async def evaluate(body):
+            score = 0.9 if b'"boa"' in body else 0.5
+            return EvaluationResponse(evaluator="medical", score=score)
+        
+        messages = [{"role": "user", "content": "Quais são os sintomas da gripe?"}]
+        with patch.object(VizevalClient, "_amake_evaluation_request_raw", side_effect=evaluate):
+            result = asyncio.run(completions.acreate_parallel(model="gpt-4", messages=messages, temperature=0.7))
+        
+        temperatures = sorted(c.kwargs["temperature"] for c in original_completions.create.call_args_list)
+        assert temperatures == pytest.approx([0.7, 0.8, 0.9])
+        assert result.final_evaluation.score == 0.9
+        assert result.attempts[-1].attempt_number == 3
+    
+    def test_acreate_parallel_returns_best_below_threshold(self):
+        """Testa que, sem tentativa aprovada, a de maior score é retornada"""
+        completions, _ = self._make_completions()
+        scores = iter([0.4, 0.6, 0.5])
+        
+        async def evaluate(body):
+            return EvaluationResponse(evaluator="medical", score=next(scores))
+        
+        messages = [{"role": "user", "content": "Quais são os sintomas da gripe?"}]
+        with patch.object(VizevalClient, "_amake_evaluation_request_raw", side_effect=evaluate):
+            result = asyncio.run(completions.acreate_parallel(model="gpt-4", messages=messages, temperature=0.7))
+        
+        assert result.total_attempts == 3
+        assert result.final_evaluation.score == 0.6
+        assert [a.attempt_number for a in result.attempts] == [1, 2, 3]
+    
+    @contextmanager
+    def _evaluation_server(self, delay=0.0):
+        """Sobe um servidor HTTP local que responde às avaliações com score 0.9"""
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                time.sleep(delay)
+                body = orjson.dumps({"evaluator": "medical", "score": 0.9})
+                self.send_response(201)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            yield f"http://127.0.0.1:{server.server_port}"
+        finally:
+            server.shutdown()
+            server.server_close()
+    
+    def test_acreate_parallel_across_event_loops(self):
+        """Testa acreate_parallel em dois asyncio.run seguidos contra um servidor local"""
+        messages = [{"role": "user", "content": "Quais são os sintomas da gripe?"}]
+        
+        with self._evaluation_server() as base_url:
+            completions, _ = self._make_completions(max_retries=0, base_url=base_url)
+            
+            for _ in range(2):
+                result = asyncio.run(completions.acreate_parallel(model="gpt-4", messages=messages))
+                assert result.final_evaluation.score == 0.9
+            
+            completions.openai_wrapper.vizeval_client.close()
+    
+    def test_concurrent_acreate_parallel_share_async_session(self):
+        """Testa que uma chamada paralela não fecha o cliente usado por outra em andamento"""
+        messages = [{"role": "user", "content": "Quais são os sintomas da gripe?"}]
+        
+        async def run_both():
+            async def delayed():
+                await asyncio.sleep(0.1)
+                return await completions.acreate_parallel(model="gpt-4", messages=messages)
+            
+            return await asyncio.gather(
+                completions.acreate_parallel(model="gpt-4", messages=messages),
+                delayed()
+            )
+        
+        with self._evaluation_server(delay=0.2) as base_url:
+            completions, _ = self._make_completions(max_retries=0, base_url=base_url)
+            results = asyncio.run(run_both())
+            completions.openai_wrapper.vizeval_client.close()
+        
+        assert [result.final_evaluation.score for result in results] == [0.9, 0.9]
+    
+    def test_parameter_schedule(self):
+        """Testa a escada de temperature/top_p calculada para as tentativas"""
+        completions, _ = self._make_completions()
+        
+        schedule = completions._parameter_schedule({"temperature": 0.85, "top_p": 0.9}, max_retries=3)
+        
+        assert schedule[0] == {}
+        assert schedule[1] == {"temperature": 0.9, "top_p": 0.95}
+        assert schedule[3] == schedule[1]
+        assert completions._parameter_schedule({}, max_retries=1)[1] == {"temperature": pytest.approx(0.8)}
+        assert completions._parameter_schedule({"temperature": None}, max_retries=1)[1] == {"temperature": pytest.approx(0.8)}
+    
+    def test_is_evaluable_call(self):
+        """Testa a detecção de chamadas avaliáveis"""
+        completions, _ = self._make_completions()
+        
+        assert completions._is_evaluable_call({"messages": [{"role": "system"}, {"role": "user"}]})
+        assert not completions._is_evaluable_call({"messages": [{"role": "system"}]})
+        assert not completions._is_evaluable_call({"messages": []})
+        assert not completions._is_evaluable_call({"prompt": "texto"})
+    
+    def test_extract_prompts(self):
+        """Testa a extração dos prompts com várias mensagens do usuário"""
+        completions, _ = self._make_completions()
+        messages = [
+            {"role": "system", "content": " Você é um médico "},
+            {"role": "user", "content": "Tenho febre."},
+            {"role": "assistant", "content": "Há quanto tempo?"},
+            {"role": "user", "content": "Dois dias.\n"},
+        ]
+        
+        assert completions._extract_prompts(messages) == ("Você é um médico", "Tenho febre.\nDois dias.")
+    
+    def test_extract_response_content_fallbacks(self):
+        """Testa a extração de conteúdo em respostas vazias ou incompletas"""
+        completions, _ = self._make_completions()
+        
+        assert completions._extract_response_content(Mock(choices=[Mock(message=Mock(content="Febre"))])) == "Febre"
+        assert completions._extract_response_content(Mock(choices=[])) == ""
+        assert completions._extract_response_content(Mock(choices=[Mock(message=Mock(content=None))])) == ""
+        assert completions._extract_response_content(object()) == ""
+
+
+class TestAdaptiveRetryPolicy:
+    """Testes para AdaptiveRetryPolicy"""
+    
+    def test_low_score_retries_immediately(self):
+        """Testa que respostas abaixo do threshold são repetidas sem espera"""
+        from vizeval.retry import AdaptiveRetryPolicy
+        
+        assert AdaptiveRetryPolicy().should_retry(0) == (True, 0.0)
+    
+    def test_backoff_depends_on_failure_type(self):
+        """Testa que rate limit espera mais que timeout e ambos crescem por tentativa"""
+        from vizeval.retry import AdaptiveRetryPolicy, FailureType, classify_error
+        
+        policy = AdaptiveRetryPolicy(base_delay=1.0)
+        rate_limited = VizevalAPIError("429", status_code=429)
+        timeout = VizevalAPIError("timeout")
+        timeout.__cause__ = TimeoutError()
+        
+        assert classify_error(rate_limited) is FailureType.RATE_LIMITED
+        assert classify_error(timeout) is FailureType.TIMEOUT
+        
+        _, rate_limited_delay = policy.should_retry(0, last_error=rate_limited)
+        _, timeout_delay = policy.should_retry(0, last_error=timeout)
+        _, later_timeout_delay = policy.should_retry(1, last_error=timeout)
+        
+        assert rate_limited_delay > timeout_delay
+        assert later_timeout_delay == 2 * timeout_delay
+    
+    def test_recurring_failures_increase_delay(self):
+        """Testa que só as falhas anteriores do mesmo tipo alongam a espera"""
+        from vizeval.retry import AdaptiveRetryPolicy
+        
+        policy = AdaptiveRetryPolicy(base_delay=1.0, failure_alpha=0.5)
+        error = VizevalAPIError("503", status_code=503)
+        
+        policy.record("medical", error=error)
+        assert policy.should_retry(0, last_error=error, evaluator="medical") == (True, 1.0)
+        
+        policy.record("medical", error=error)
+        assert policy.should_retry(0, last_error=error, evaluator="medical") == (True, 2.0)
+    
+    def test_delay_recovers_after_successes(self):
+        """Testa que a espera volta a cair quando as tentativas voltam a dar certo"""
+        from vizeval.retry import AdaptiveRetryPolicy
+        
+        policy = AdaptiveRetryPolicy(base_delay=1.0, max_delay=100.0, failure_alpha=0.5)
+        error = VizevalAPIError("503", status_code=503)
+        
+        for _ in range(10):
+            policy.record("medical", error=error)
+        _, burst_delay = policy.should_retry(0, last_error=error, evaluator="medical")
+        
+        for _ in range(10):
+            policy.record("medical")
+        policy.record("medical", error=error)
+        _, recovered_delay = policy.should_retry(0, last_error=error, evaluator="medical")
+        
+        assert burst_delay == pytest.approx(10.0)
+        assert recovered_delay == pytest.approx(1.0, abs=0.01)
+    
+    def test_invalid_failure_alpha(self):
+        """Testa a validação de failure_alpha"""
+        from vizeval.retry import AdaptiveRetryPolicy
+        
+        with pytest.raises(VizevalConfigError):
+            AdaptiveRetryPolicy(failure_alpha=1.0)
+    
+    def test_invalid_data_retries_once(self):
+        """Testa que dados inválidos permitem no máximo uma nova tentativa"""
+        from vizeval.retry import AdaptiveRetryPolicy
+        
+        policy = AdaptiveRetryPolicy()
+        error = VizevalAPIError("400", status_code=400)
+        
+        assert policy.should_retry(0, last_error=error)[0] is True
+        assert policy.should_retry(1, last_error=error)[0] is False
+
+
 class TestEvaluators:
     """Testes para evaluators"""
     
@@ -176,8 +856,19 @@ class TestEvaluators:
         assert info["threshold"] == 0.8
         assert "médico" in info["description"]
         
+        assert get_evaluator_info(Evaluator.JURIDICAL)["threshold"] == 0.7
+        
         with pytest.raises(ValueError, match="Evaluator 'invalid' não disponível"):
             get_evaluator_info("invalid")
+    
+    def test_evaluator_defaults_read_only(self):
+        """Testa que os defaults dos evaluators não podem ser alterados"""
+        from vizeval.evaluators import EVALUATOR_DEFAULTS, get_evaluator_info
+        
+        with pytest.raises(TypeError):
+            EVALUATOR_DEFAULTS["medical"] = {}
+        with pytest.raises(TypeError):
+            get_evaluator_info("medical")["threshold"] = 0.1
 
 
 if __name__ == "__main__":